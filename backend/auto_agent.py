@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import time
 from datetime import datetime
 from typing import Dict, List
@@ -9,138 +10,172 @@ from executor import TradingExecutor
 from wallet_manager import WalletManager
 from portfolio import Portfolio
 
+logger = logging.getLogger("auto_agent")
+logger.setLevel(logging.INFO)
+
+CRYPTO_SET = frozenset({"BTC", "ETH"})
+
+class _LazyClock:
+    """Formats the wall-clock time only when a log record is actually emitted"""
+    def __str__(self):
+        return datetime.now().strftime('%H:%M:%S')
+
+_CLOCK = _LazyClock()
+
 class AutoAgent:
     """
     The Brain of the Autonomous Trading System.
     Orchestrates scanning, analysis, risk checking, and execution in a continuous loop.
     """
     
-    def __init__(self, executor: TradingExecutor, wallet_manager: WalletManager, portfolio: Portfolio = None):
+    def __init__(self, executor: TradingExecutor, wallet_manager: WalletManager, portfolio: Portfolio = None,
+                 analyzer: SentimentAnalyzer = None):
         self.executor = executor
         self.wallet_manager = wallet_manager
         self.portfolio = portfolio
         self.scanner = MarketScanner()
-        self.analyzer = SentimentAnalyzer()
+        self.analyzer = analyzer or SentimentAnalyzer()  # Share the API's instance so FinBERT loads once
         self.risk_manager = executor.risk_manager
         
         self.is_running = False
         self.loop_interval = 60 # Seconds between scan cycles
         self.active_strategies = ["sentiment_momentum", "mean_reversion"]
+        # Bound concurrent per-asset work to stay under Alpaca rate limits
+        self._asset_semaphore = asyncio.Semaphore(4)
         
-        print("🤖 AutoAgent initialized - Waiting for start command")
+        logger.info("🤖 AutoAgent initialized - Waiting for start command")
 
     async def start(self):
         """Start the autonomous trading loop"""
         self.is_running = True
-        print("🚀 AutoAgent STARTED - Autonomous Mode Active")
+        logger.info("🚀 AutoAgent STARTED - Autonomous Mode Active")
         
         while self.is_running:
             try:
                 await self.run_cycle()
                 await asyncio.sleep(self.loop_interval)
             except Exception as e:
-                print(f"❌ Error in AutoAgent loop: {e}")
+                logger.error("❌ Error in AutoAgent loop: %s", e)
                 await asyncio.sleep(5) # Short pause on error
 
     def stop(self):
         """Stop the autonomous trading loop"""
         self.is_running = False
-        print("🛑 AutoAgent STOPPED")
+        logger.info("🛑 AutoAgent STOPPED")
 
     async def run_cycle(self):
         """Execute one full trading cycle"""
-        print(f"\n--- 🔄 Cycle Start: {datetime.now().strftime('%H:%M:%S')} ---")
+        logger.info("\n--- 🔄 Cycle Start: %s ---", _CLOCK)
         
-        # 0. MONITOR RISK (Stop Losses)
-        await self.monitor_risk()
+        # Snapshot account state once; the sub-routines share it instead of re-fetching
+        positions, account = await asyncio.gather(
+            asyncio.to_thread(self.executor.get_positions),
+            asyncio.to_thread(self.executor.get_account_info)
+        )
         
-        # 1. PERIODIC REBALANCE (e.g. every 60 cycles)
-        await self.rebalance_portfolio()
+        try:
+            # 0. MONITOR RISK (Stop Losses)
+            await self.monitor_risk(positions)
+        
+            # 1. PERIODIC REBALANCE (e.g. every 60 cycles)
+            await self.rebalance_portfolio(positions, account)
         
-        # 1. RISK CHECK: Can we trade?
-        can_trade, reason = self.risk_manager.can_trade()
-        if not can_trade:
-            print(f"⚠️ Trading Skipped: {reason}")
-            return
+            # 1. RISK CHECK: Can we trade?
+            can_trade, reason = self.risk_manager.can_trade()
+            if not can_trade:
+                logger.warning("⚠️ Trading Skipped: %s", reason)
+                return
 
-        # 2. SCAN: Fetch potential opportunities
-        # CRYPTO-ONLY MODE: 24/7 trading (stocks require market hours)
-        assets = [
-            {"symbol": "BTC/USD", "type": "crypto", "id": "bitcoin"},
-            {"symbol": "ETH/USD", "type": "crypto", "id": "ethereum"},
-        ]
-        
-        # 3. ANALYZE & EXECUTE
-        for asset in assets:
-            if not self.is_running: break # Stop immediately if commanded
+            # 2. SCAN: Fetch potential opportunities
+            # CRYPTO-ONLY MODE: 24/7 trading (stocks require market hours)
+            assets = [
+                {"symbol": "BTC/USD", "type": "crypto", "id": "bitcoin"},
+                {"symbol": "ETH/USD", "type": "crypto", "id": "ethereum"},
+            ]
+        
+            # Fetch all quotes in one round-trip per asset class before fanning out
+            await asyncio.to_thread(self.executor.get_current_prices, [a["symbol"] for a in assets])
             
+            # 3. ANALYZE & EXECUTE (assets are independent, so overlap their API latency)
+            await asyncio.gather(*[self._process_asset(asset) for asset in assets])
+        
+            if (await self.wallet_manager.get_balance_async()).get("balance_eth", 0) < 0.05:
+                logger.warning("⚠️ Low ETH Balance for Gas")
+        finally:
+            self.executor.clear_price_cache()
+
+    async def _process_asset(self, asset: Dict):
+        """Analyze a single asset and execute any resulting signal"""
+        async with self._asset_semaphore:
+            if not self.is_running: return # Stop immediately if commanded
+        
             symbol = asset["symbol"]
-            print(f"🔎 Analyzing {symbol}...")
-            
+            logger.debug("🔎 Analyzing %s...", symbol)
+        
             # A. Sentiment Analysis
             # In real system: fetch news here. mocking for demo logic.
             mock_news = [f"{symbol} reporting high growth and strong adoption."]
-            sentiment = self.analyzer.get_aggregated_sentiment(mock_news)
-            
+            # FinBERT inference (and its first-use load/compile) must not run on the event loop
+            sentiment = await asyncio.to_thread(self.analyzer.get_aggregated_sentiment, mock_news)
+        
             # B. Technical Analysis (Mocked via logic for now)
             # Real system would call scanner.get_technical_indicators(symbol)
             technical_signal = "Buy" # Placeholder
-            
+        
             # C. Decision Logic
             signal = "Hold"
             confidence = 0.0
-            
+        
             if sentiment == "Bullish" and technical_signal == "Buy":
                 signal = "Buy"
                 confidence = 0.85
             elif sentiment == "Bearish":
                 signal = "Sell"
                 confidence = 0.75
-                
+            
             # D. Execution
             if signal != "Hold":
-                print(f"⚡ Signal Generated: {signal} {symbol} ({confidence*100}%)")
-                
+                logger.info("⚡ Signal Generated: %s %s (%s%%)", signal, symbol, confidence * 100)
+            
                 # ROUTING: Stocks -> Alpaca, Crypto -> Check preference or default to Alpaca for now
                 if asset["type"] == "crypto" and self.wallet_manager.w3:
                      # REAL DEFI EXECUTION
-                     print(f"💡 Executing On-Chain Swap for {symbol}")
+                     logger.info("💡 Executing On-Chain Swap for %s", symbol)
                      # In a real scenario, we'd map symbol to contract address (e.g. USDC -> ETH)
                      # For this demo we'll assume a swap of 0.01 ETH for testing
-                     tx = self.wallet_manager.execute_swap(
+                     tx = await self.wallet_manager.execute_swap_async(
                          token_in="ETH",
                          token_out=symbol,
                          amount=0.01
                      )
-                     print(f"✅ On-Chain TX Sent: {tx['tx_hash']}")
-                
+                     if tx['status'] == 'success':
+                         logger.info("✅ On-Chain TX Sent: %s", tx['tx_hash'])
+                     else:
+                         logger.error("❌ On-Chain TX Failed: %s", tx['message'])
+            
                 # Execute via existing Executor (Alpaca)
-                result = self.executor.execute_trade(
+                result = await asyncio.to_thread(
+                    self.executor.execute_trade,
                     symbol=symbol, 
                     signal=signal, 
                     confidence=confidence, 
                     reason=f"AutoAgent: {sentiment} Sentiment"
                 )
-                
+            
                 if result['status'] == 'success':
-                    print(f"✅ Trade Executed: {result['side']} {result['shares']} {symbol}")
+                    logger.info("✅ Trade Executed: %s %s %s", result['side'], result['shares'], symbol)
                     # Log to portfolio tracker
                     if self.portfolio:
-                        self.portfolio.log_trade(result)
+                        await asyncio.to_thread(self.portfolio.log_trade, result)
                 else:
-                    print(f"⚠️ Trade Rejected: {result['message']}")
+                    logger.warning("⚠️ Trade Rejected: %s", result['message'])
             else:
-                 print(f"Result: {symbol} - Hold (No strong signal)")
-                 
-        if self.wallet_manager.get_balance().get("balance_eth", 0) < 0.05:
-            print("⚠️ Low ETH Balance for Gas")
+                 logger.debug("Result: %s - Hold (No strong signal)", symbol)
 
-    async def monitor_risk(self):
+    async def monitor_risk(self, positions: List[Dict]):
         """Monitor open positions for manual stop-loss (esp. for crypto)"""
-        print("🛡️ Monitoring Active Risk...")
+        logger.debug("🛡️ Monitoring Active Risk...")
         try:
-            positions = self.executor.get_positions()
-            
             for pos in positions:
                 symbol = pos['symbol']
                 # Alpaca doesn't support bracket orders for crypto, so we monitor manually
@@ -148,49 +183,51 @@ class AutoAgent:
                 
                 # Check Stop Loss (e.g., -3%)
                 if pnl_pct <= -self.risk_manager.max_stop_loss_pct:
-                    print(f"🚨 STOP LOSS HIT for {symbol} ({pnl_pct:.2f}%)")
-                    result = self.executor.close_position(symbol)
+                    logger.warning("🚨 STOP LOSS HIT for %s (%.2f%%)", symbol, pnl_pct)
+                    result = await asyncio.to_thread(self.executor.close_position, symbol)
                     if result['status'] == 'success' and self.portfolio:
-                        self.portfolio.close_trade(symbol, pos['current_price'], pos['pnl'])
+                        await asyncio.to_thread(self.portfolio.close_trade, symbol, pos['current_price'], pos['pnl'])
                 
                 # Check Take Profit (Fallback, e.g., +10%)
                 elif pnl_pct >= 10.0:
-                    print(f"💰 TAKE PROFIT HIT for {symbol} ({pnl_pct:.2f}%)")
-                    result = self.executor.close_position(symbol)
+                    logger.info("💰 TAKE PROFIT HIT for %s (%.2f%%)", symbol, pnl_pct)
+                    result = await asyncio.to_thread(self.executor.close_position, symbol)
                     if result['status'] == 'success' and self.portfolio:
-                        self.portfolio.close_trade(symbol, pos['current_price'], pos['pnl'])
+                        await asyncio.to_thread(self.portfolio.close_trade, symbol, pos['current_price'], pos['pnl'])
         except Exception as e:
-            print(f"Error in risk monitor: {e}")
+            logger.error("Error in risk monitor: %s", e)
 
-    async def rebalance_portfolio(self):
+    async def rebalance_portfolio(self, positions: List[Dict], account: Dict):
         """
         Check and rebalance portfolio allocations.
         Target: 50% Crypto, 30% Stocks, 20% Cash
         """
-        print("⚖️ Checking Portfolio Balance...")
+        logger.debug("⚖️ Checking Portfolio Balance...")
         
         # 1. Get total portfolio value
-        positions = self.executor.get_positions()
-        account = self.executor.get_account_info()
         total_value = account.get("portfolio_value", 0)
         
         if total_value == 0: return
 
         # 2. Calculate current allocations
-        crypto_value = sum(p["market_value"] for p in positions if p["symbol"] in ["BTC", "ETH"])
-        stock_value = sum(p["market_value"] for p in positions if p["symbol"] not in ["BTC", "ETH"])
+        crypto_value = stock_value = 0.0
+        for p in positions:
+            if p["symbol"] in CRYPTO_SET:
+                crypto_value += p["market_value"]
+            else:
+                stock_value += p["market_value"]
         
         crypto_alloc = crypto_value / total_value
         stock_alloc = stock_value / total_value
         
-        print(f"Current Allocation: Crypto {crypto_alloc:.1%}, Stocks {stock_alloc:.1%}")
+        logger.debug("Current Allocation: Crypto %.1f%%, Stocks %.1f%%", crypto_alloc * 100, stock_alloc * 100)
         
         # 3. Rebalance if deviation > 5%
         # (Simplified logic: Close overweight, Open underweight would be in main loop)
         if crypto_alloc > 0.55:
-            print("📉 Crypto Overweight - Reducing exposure")
+            logger.info("📉 Crypto Overweight - Reducing exposure")
             # Logic to sell portion of crypto
             
         elif stock_alloc > 0.35:
-             print("📉 Stocks Overweight - Reducing exposure")
+             logger.info("📉 Stocks Overweight - Reducing exposure")
              # Logic to sell portion of stocks
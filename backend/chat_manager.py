@@ -1,6 +1,52 @@
+from dataclasses import asdict
 from datetime import datetime
 from typing import Dict, List, Optional
 import random
+import re
+import time
+
+def _intent(*words: str) -> re.Pattern:
+    # Leading word boundary only, so inflections like "trades" or "stopping" still match;
+    # short words carry their own trailing \b so "hi" doesn't fire on "high" or "history"
+    return re.compile(r"\b(?:" + "|".join(words) + ")")
+
+PORTFOLIO_CACHE_TTL = 5.0 # Seconds a check_portfolio result is reused
+
+# Response timestamps only need second granularity, so format once per second.
+# (second, formatted) is replaced in one assignment so pool threads never see a torn pair
+_last_ts = (0, "")
+
+def _now_iso() -> str:
+    global _last_ts
+    s = int(time.time())
+    cached = _last_ts
+    if s != cached[0]:
+        cached = (s, datetime.fromtimestamp(s).isoformat())
+        _last_ts = cached
+    return cached[1]
+
+class ChatState:
+    """
+    Holds the components ChatManager reports on.
+    Its bound methods replace per-call global lookups in lambdas.
+    """
+    
+    def __init__(self, executor, risk_manager, auto_agent):
+        self.executor = executor
+        self.risk_manager = risk_manager
+        self.auto_agent = auto_agent
+    
+    def agent_status(self) -> bool:
+        return self.auto_agent.is_running if self.auto_agent else False
+    
+    def check_portfolio(self) -> Dict:
+        # Called from ChatManager._get_portfolio, which already applies the TTL cache
+        return {
+            "account": self.executor.get_account_info() if self.executor else {},
+            # Same precomputed snapshot /portfolio/status maintains
+            "risk_metrics": asdict(self.risk_manager.get_snapshot()),
+            "is_running": self.agent_status()
+        }
 
 class ChatManager:
     """
@@ -8,60 +54,76 @@ class ChatManager:
     Processes user intent and generates context-aware responses.
     """
     
+    # 1. INTENT RECOGNITION (Simple Keyword Matching for V1)
+    # Checked in order: (pattern, handler, action)
+    INTENTS = [
+        # A. STATUS / PORTFOLIO
+        (_intent("status", "portfolio", r"how\b", "doing", "performance", "balance"), "_get_status_response", None),
+        # B. EXPLANATION
+        (_intent("why", "reason", "explain", "trade"), "_get_explanation_response", None),
+        # C. COMMANDS
+        (_intent("stop", "halt"), "_stop_response", "STOP_AGENT"),
+        (_intent("start", "resume"), "_start_response", None),
+        # D. RISK
+        (_intent("risk", "exposure"), "_get_risk_response", None),
+        # E. GREETING/GENERAL
+        (_intent(r"hi\b", "hello", r"hey\b", "help"), "_greeting_response", None),
+    ]
+    
     def __init__(self, check_portfolio_func, get_agent_status_func, stop_agent_func):
         self.check_portfolio = check_portfolio_func
         self.get_agent_status = get_agent_status_func
         self.stop_agent = stop_agent_func
         
         self.context = [] # History of last few messages
-        
+        self._portfolio_cache = (0.0, None) # (monotonic timestamp, check_portfolio result)
+    
     def process_message(self, message: str) -> Dict:
         """
         Process a user message and return a response.
         """
         msg = message.lower()
-        response = ""
+        response = "I'm analyzing the markets. You can ask me about 'portfolio status', 'risk levels', or ask 'why' I made a recent trade."
         action_taken = None
         
-        # 1. INTENT RECOGNITION (Simple Keyword Matching for V1)
-        
-        # A. STATUS / PORTFOLIO
-        if any(w in msg for w in ["status", "portfolio", "how", "doing", "performance", "balance"]):
-            response = self._get_status_response()
-            
-        # B. EXPLANATION
-        elif any(w in msg for w in ["why", "reason", "explain", "trade"]):
-            response = self._get_explanation_response()
-            
-        # C. COMMANDS
-        elif "stop" in msg or "halt" in msg:
-            self.stop_agent()
-            response = "🚨 EMERGENCY STOP ACTIVATED. The autonomous agent has been halted. All trading is paused."
-            action_taken = "STOP_AGENT"
-            
-        elif "start" in msg or "resume" in msg:
-            response = "To start the agent, please use the 'Start Auto-Trading' button on the dashboard for safety confirmation."
-            
-        # D. RISK
-        elif "risk" in msg or "exposure" in msg:
-            response = self._get_risk_response()
-            
-        # E. GREETING/GENERAL
-        elif any(w in msg for w in ["hi", "hello", "hey", "help"]):
-            response = "Hello! I am your Autonomous Trading Agent. I can report on portfolio status, explain my trades, or executing emergency stops. How can I assist you?"
-            
-        else:
-            response = "I'm analyzing the markets. You can ask me about 'portfolio status', 'risk levels', or ask 'why' I made a recent trade."
+        for pattern, handler, action in self.INTENTS:
+            if pattern.search(msg):
+                response = getattr(self, handler)()
+                action_taken = action
+                break
             
         return {
             "response": response,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "action": action_taken
         }
 
+    def _stop_response(self) -> str:
+        """Halt the agent immediately"""
+        self.stop_agent()
+        return "🚨 EMERGENCY STOP ACTIVATED. The autonomous agent has been halted. All trading is paused."
+
+    def _start_response(self) -> str:
+        """Starting requires dashboard confirmation"""
+        return "To start the agent, please use the 'Start Auto-Trading' button on the dashboard for safety confirmation."
+
+    def _greeting_response(self) -> str:
+        """Introduce the agent's capabilities"""
+        return "Hello! I am your Autonomous Trading Agent. I can report on portfolio status, explain my trades, or executing emergency stops. How can I assist you?"
+
+    def _get_portfolio(self) -> Dict:
+        """check_portfolio with a short TTL so bursts of questions share one fetch"""
+        now = time.monotonic()
+        ts, data = self._portfolio_cache
+        if now - ts < PORTFOLIO_CACHE_TTL and data:
+            return data
+        data = self.check_portfolio()
+        self._portfolio_cache = (now, data)
+        return data
+
     def _get_status_response(self) -> str:
         """Generate status report"""
-        data = self.check_portfolio()
+        data = self._get_portfolio()
         metrics = data.get("risk_metrics", {})
         account = data.get("account", {})
         
@@ -89,7 +151,7 @@ class ChatManager:
 
     def _get_risk_response(self) -> str:
         """Generate risk report"""
-        data = self.check_portfolio()
+        data = self._get_portfolio()
         metrics = data.get("risk_metrics", {})
         
         return (
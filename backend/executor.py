@@ -1,16 +1,36 @@
 import os
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest, StopLossRequest
 from alpaca.trading.enums import OrderSide, TimeInForce, OrderClass
 from alpaca.data.historical import StockHistoricalDataClient, CryptoHistoricalDataClient
 from alpaca.data.requests import StockLatestQuoteRequest, CryptoLatestQuoteRequest
-from typing import Optional, Dict
-from risk_manager import RiskManager
+from typing import Optional, Dict, List
+from risk_manager import RiskManager, is_crypto
 from wallet_manager import WalletManager
 
 load_dotenv()
 
+@lru_cache(maxsize=64)
+def _order_template(symbol: str, side: OrderSide, time_in_force: TimeInForce) -> MarketOrderRequest:
+    """Validated once per (symbol, side, tif); callers model_copy it with the real qty"""
+    return MarketOrderRequest(symbol=symbol, qty=1, side=side, time_in_force=time_in_force)
+
+def _position_to_dict(p) -> Dict:
+    return {
+        "symbol": p.symbol,
+        "qty": float(p.qty),
+        "entry_price": float(p.avg_entry_price),
+        "current_price": float(p.current_price),
+        "market_value": float(p.market_value),
+        "pnl": float(p.unrealized_pl),
+        "pnl_pct": float(p.unrealized_plpc) * 100
+    }
+
+POSITIONS_CACHE_TTL = 0.5 # Seconds; absorbs dashboard polling bursts
+
 class TradingExecutor:
     """
     Autonomous trading execution engine using Alpaca API.
@@ -25,6 +45,15 @@ class TradingExecutor:
         self.is_trading = False
         self.wallet_manager = wallet_manager
         
+        # Order constants resolved once instead of per trade
+        self._buy, self._sell = OrderSide.BUY, OrderSide.SELL
+        self._gtc, self._day = TimeInForce.GTC, TimeInForce.DAY
+        self._sides = {'Buy': self._buy, 'Sell': self._sell}
+        
+        # Prices batch-fetched for the current agent cycle (symbol -> ask price)
+        self._price_cache: Dict[str, float] = {}
+        self._positions_cache = (0.0, None) # (monotonic timestamp, positions)
+        
         if not self.api_key or not self.secret_key:
             print("⚠️ Warning: Alpaca API credentials not found. Trading functionality will be limited.")
             self.trading_client = None
@@ -40,8 +69,44 @@ class TradingExecutor:
         
         print(f"Trading Executor initialized (Paper Trading: {self.base_url})")
     
+    def get_latest_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Get current prices for many symbols with one quote request per asset class"""
+        crypto = [s for s in symbols if "/" in s]
+        stocks = [s for s in symbols if "/" not in s]
+        quotes = {}
+        
+        try:
+            if crypto:
+                request = CryptoLatestQuoteRequest(symbol_or_symbols=crypto)
+                quotes.update(self.crypto_data_client.get_crypto_latest_quote(request))
+        except Exception as e:
+            print(f"Error fetching crypto prices for {crypto}: {e}")
+        
+        try:
+            if stocks:
+                request = StockLatestQuoteRequest(symbol_or_symbols=stocks)
+                quotes.update(self.data_client.get_stock_latest_quote(request))
+        except Exception as e:
+            print(f"Error fetching stock prices for {stocks}: {e}")
+        
+        return {sym: float(q.ask_price) for sym, q in quotes.items()}
+    
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Batch-fetch prices into the per-cycle cache used by get_current_price"""
+        prices = self.get_latest_prices(symbols)
+        self._price_cache.update(prices)
+        return prices
+    
+    def clear_price_cache(self):
+        """Drop batch-fetched prices at the end of a cycle"""
+        self._price_cache.clear()
+    
     def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current market price for a symbol"""
+        cached = self._price_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
         try:
             if "/" in symbol: # Crypto symbol like BTC/USD
                 request = CryptoLatestQuoteRequest(symbol_or_symbols=symbol)
@@ -82,7 +147,7 @@ class TradingExecutor:
             return {"status": "error", "message": f"Could not fetch price for {symbol}"}
         
         # Determine order side
-        side = OrderSide.BUY if signal == 'Buy' else OrderSide.SELL
+        side = self._sides.get(signal, self._sell)
         
         # Calculate position size
         shares, position_value = self.risk_manager.calculate_position_size(
@@ -104,38 +169,31 @@ class TradingExecutor:
         stop_loss_price = self.risk_manager.calculate_stop_loss(current_price, side.value)
         
         try:
-            # Determine order parameters
-            is_crypto = "/" in symbol or "USD" in symbol
-            
             # Create order data
-            if is_crypto:
+            if is_crypto(symbol):
                 # Alpaca does NOT support bracket orders for crypto yet
-                order_data = MarketOrderRequest(
-                    symbol=symbol,
-                    qty=shares,
-                    side=side,
-                    time_in_force=TimeInForce.GTC
-                )
+                order_data = _order_template(symbol, side, self._gtc).model_copy(update={"qty": shares})
             else:
                 # Create bracket order for stocks (entry + stop loss + take profit)
                 order_data = MarketOrderRequest(
                     symbol=symbol,
                     qty=shares,
                     side=side,
-                    time_in_force=TimeInForce.DAY,
+                    time_in_force=self._day,
                     order_class=OrderClass.BRACKET,
                     stop_loss=StopLossRequest(stop_price=stop_loss_price),
                     take_profit={"limit_price": current_price * 1.10}  # 10% profit target
                 )
             
             order = self.trading_client.submit_order(order_data)
+            self._positions_cache = (0.0, None)
             
             # Update risk manager
             self.risk_manager.update_position(symbol, position_value)
             
             return {
                 "status": "success",
-                "order_id": order.id,
+                "order_id": str(order.id),  # UUID -> str keeps the dict JSON-native
                 "symbol": symbol,
                 "side": side.value,
                 "shares": shares,
@@ -151,20 +209,14 @@ class TradingExecutor:
     
     def get_positions(self) -> list:
         """Get all open positions"""
+        now = time.monotonic()
+        ts, cached = self._positions_cache
+        if cached is not None and now - ts < POSITIONS_CACHE_TTL:
+            return cached
         try:
-            positions = self.trading_client.get_all_positions()
-            return [
-                {
-                    "symbol": p.symbol,
-                    "qty": float(p.qty),
-                    "entry_price": float(p.avg_entry_price),
-                    "current_price": float(p.current_price),
-                    "market_value": float(p.market_value),
-                    "pnl": float(p.unrealized_pl),
-                    "pnl_pct": float(p.unrealized_plpc) * 100
-                }
-                for p in positions
-            ]
+            positions = [_position_to_dict(p) for p in self.trading_client.get_all_positions()]
+            self._positions_cache = (now, positions)
+            return positions
         except Exception as e:
             print(f"Error fetching positions: {e}")
             return []
@@ -172,11 +224,12 @@ class TradingExecutor:
     def close_position(self, symbol: str) -> Dict:
         """Close a specific position"""
         try:
-            position = self.trading_client.get_open_position(symbol)
-            pnl = float(position.unrealized_pl)
+            position = _position_to_dict(self.trading_client.get_open_position(symbol))
+            pnl = position["pnl"]
             
             # Close the position
             self.trading_client.close_position(symbol)
+            self._positions_cache = (0.0, None)
             
             # Update risk manager
             self.risk_manager.close_position(symbol, pnl)
@@ -185,6 +238,8 @@ class TradingExecutor:
                 "status": "success",
                 "symbol": symbol,
                 "pnl": pnl,
+                "exit_price": position["current_price"],
+                "position": position,
                 "message": f"Position closed with P&L: ${pnl:,.2f}"
             }
         except Exception as e:
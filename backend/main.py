@@ -1,19 +1,50 @@
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from scanner import MarketScanner
 from analyzer import SentimentAnalyzer
 from risk_manager import RiskManager
 from executor import TradingExecutor
-from wallet_manager import WalletManager
+from wallet_manager import WalletManager, shutdown_sign_pool
 from auto_agent import AutoAgent
 from portfolio import Portfolio
-from chat_manager import ChatManager
+from chat_manager import ChatManager, ChatState
 from pydantic import BaseModel
 import uvicorn
+import logging
+import numpy as np
+import orjson
+import os
 
 import asyncio
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from async_lru import alru_cache
 from contextlib import asynccontextmanager
 
+# Route component loggers (e.g. the AutoAgent loop) to stdout like the old prints
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+# httpx logs every request at INFO, which would flood the output with scanner polls
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Dashboard assets for /scan/all
+_SCAN_ASSETS = ("BTC/USD", "ETH/USD", "AAPL", "TSLA", "NVDA")
+
+# Crypto tickers accepted by /scan/{symbol} -> CoinGecko coin id
+_CRYPTO_IDS = {"BTC": "bitcoin", "ETH": "ethereum", "DOGE": "dogecoin"}
+_CRYPTO_SYMBOLS = frozenset(_CRYPTO_IDS)
+
+# Sentiment label -> score
+_SCORE = {"Positive": 1, "Negative": -1, "Neutral": 0}
+
+@lru_cache(maxsize=256)
+def _classify_symbol(symbol: str) -> tuple:
+    """symbol -> (is_crypto, coingecko_id)"""
+    if symbol in _CRYPTO_SYMBOLS:
+        return True, _CRYPTO_IDS[symbol]
+    return False, None
+
 # Global variables for async background task
 agent_task = None
 
@@ -28,74 +59,102 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress larger payloads such as the trade history
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Trading components, built in startup_event so they exist once per serving process
+# (not in `python main.py`'s own module or a multi-worker supervisor)
+scanner = analyzer = risk_manager = wallet_manager = portfolio = None
+executor = auto_agent = chat_manager = None
 
-# Initialize trading components
-print("🚀 Initializing components...")
-scanner = MarketScanner()
-analyzer = SentimentAnalyzer()
-risk_manager = RiskManager()
-wallet_manager = WalletManager()
-portfolio = Portfolio()
+def _init_components():
+    global scanner, analyzer, risk_manager, wallet_manager, portfolio, executor, auto_agent, chat_manager
+    print("🚀 Initializing components...")
+    scanner = MarketScanner()
+    analyzer = SentimentAnalyzer()
+    risk_manager = RiskManager()
+    wallet_manager = WalletManager()
+    portfolio = Portfolio()
+
+    executor = TradingExecutor(risk_manager, wallet_manager)
+    # The agent keeps its state in-process, so with WEB_WORKERS > 1 enable it on a single
+    # dedicated process only (AUTO_AGENT_ENABLED=false everywhere else)
+    if os.getenv('AUTO_AGENT_ENABLED', 'true').lower() == 'true':
+        auto_agent = AutoAgent(executor, wallet_manager, portfolio, analyzer)
+    else:
+        auto_agent = None
+        print("ℹ️ AutoAgent disabled via environment variable")
 
-executor = TradingExecutor(risk_manager, wallet_manager)
-auto_agent = AutoAgent(executor, wallet_manager, portfolio)
-print("✅ All components initialized successfully")
+    # ChatState's bound methods give ChatManager access to the latest state dynamically
+    chat_state = ChatState(executor, risk_manager, auto_agent)
+    chat_manager = ChatManager(
+        check_portfolio_func=chat_state.check_portfolio,
+        get_agent_status_func=chat_state.agent_status,
+        stop_agent_func=_stop_agent
+    )
+    print("✅ All components initialized successfully")
 
 @app.on_event("startup")
 async def startup_event():
-    """Start background tasks on server startup"""
-    pass # agent is started manually via API for safety
+    """Build components and start background tasks on server startup"""
+    # Blocking SDK/disk calls are offloaded with asyncio.to_thread; give them room
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=64))
+    _init_components()
+    # agent is started manually via API for safety
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup updates on shutdown"""
+    await scanner.aclose()
     if auto_agent:
         auto_agent.stop()
+        await auto_agent.scanner.aclose()
+    shutdown_sign_pool()
 
-# Initialize Chat Manager
-# We pass lambda functions to allow ChatManager to access latest state dynamically
-chat_manager = ChatManager(
-    check_portfolio_func=lambda: {
-        "account": executor.get_account_info() if executor else {},
-        "risk_metrics": risk_manager.get_risk_metrics(),
-        "is_running": auto_agent.is_running if auto_agent else False
-    },
-    get_agent_status_func=lambda: auto_agent.is_running if auto_agent else False,
-    stop_agent_func=lambda: stop_autonomous_trading()
-)
+def _stop_agent():
+    """Stop the agent; safe to call from the event loop or a worker thread (chat)"""
+    if not auto_agent:
+        return {"status": "error", "message": "Agent not initialized"}
+    
+    auto_agent.stop()
+    if executor:
+        executor.stop_trading()
+    
+    if agent_task:
+        # Task.cancel is not thread-safe; schedule it on the task's own loop
+        agent_task.get_loop().call_soon_threadsafe(agent_task.cancel)
+        
+    return {
+        "status": "success",
+        "message": "Autonomous trading stopped"
+    }
 
 class ChatRequest(BaseModel):
     message: str
 
 @app.post("/chat")
-def chat_with_agent(request: ChatRequest):
+async def chat_with_agent(request: ChatRequest):
     """Chat with the AI agent"""
-    return chat_manager.process_message(request.message)
+    return await asyncio.to_thread(chat_manager.process_message, request.message)
 
 @app.get("/")
 def read_root():
     return {"status": "online", "message": "AI Trading Bot API is running"}
 
-@app.get("/scan/all")
-def scan_all():
-    """Fetch live market data for dashboard assets"""
-    print("Received request for /scan/all")
-    assets = [
-        {"symbol": "BTC/USD", "type": "crypto"},
-        {"symbol": "ETH/USD", "type": "crypto"},
-        {"symbol": "AAPL", "type": "stock"},
-        {"symbol": "TSLA", "type": "stock"},
-        {"symbol": "NVDA", "type": "stock"},
-    ]
-    
+@alru_cache(maxsize=4, ttl=3)
+async def _scan_all_cached(symbols: tuple) -> list:
+    """Price + sentiment snapshot; concurrent dashboard refreshes share one upstream fetch"""
     results = []
-    if not executor:
-        return []
-
-    for asset in assets:
-        symbol = asset["symbol"]
-        price_val = executor.get_current_price(symbol)
-        
+    
+    # One quote request per asset class instead of one per symbol
+    prices = await asyncio.to_thread(executor.get_latest_prices, list(symbols))
+    
+    # One batched sentiment pass over every symbol's headlines
+    all_news = [[f"{symbol} market conditions are being monitored by Neural Core."] for symbol in symbols]
+    sentiments = await asyncio.to_thread(analyzer.get_aggregated_sentiment_batch, all_news)
+    
+    for symbol, sentiment in zip(symbols, sentiments):
+        price_val = prices.get(symbol)
         if price_val:
             price = f"${price_val:,.2f}"
             # For change, we'd need historical data or a separate quote, 
@@ -105,9 +164,6 @@ def scan_all():
             price = "N/A"
             change = "Offline"
             
-        mock_news = [f"{symbol} market conditions are being monitored by Neural Core."]
-        sentiment = analyzer.get_aggregated_sentiment(mock_news)
-        
         results.append({
             "symbol": symbol.split('/')[0] if '/' in symbol else symbol,
             "price": price,
@@ -115,24 +171,37 @@ def scan_all():
             "trend": sentiment
         })
     
+    return results
+
+@app.get("/scan/all")
+async def scan_all():
+    """Fetch live market data for dashboard assets"""
+    print("Received request for /scan/all")
+    if not executor:
+        return []
+
+    results = await _scan_all_cached(_SCAN_ASSETS)
+    
     print(f"Returned {len(results)} live assets")
     return results
 
 @app.get("/scan/{symbol}")
-def scan_market(symbol: str):
+async def scan_market(symbol: str):
     # Determine if it's crypto or stock from symbol (simple heuristic)
-    if symbol in ["BTC", "ETH", "DOGE"]:
-        data = scanner.get_crypto_price(symbol.lower())
+    is_crypto, coin_id = _classify_symbol(symbol)
+    if is_crypto:
+        data = await scanner.get_crypto_price(coin_id)
     else:
-        data = scanner.get_stock_data(symbol)
+        data = await scanner.get_stock_data(symbol)
         
     # Heuristic for "Accuracy"
     mock_news = [
         f"{symbol} market conditions are being analyzed by AI.",
         f"Social media volume for {symbol} has increased by 15%."
     ]
-    sentiment_results = analyzer.analyze_news(mock_news)
-    avg_score = sum([1 if r['label'] == 'Positive' else -1 if r['label'] == 'Negative' else 0 for r in sentiment_results]) / len(sentiment_results)
+    sentiment_results = await asyncio.to_thread(analyzer.analyze_news, mock_news)
+    scores = np.fromiter((_SCORE.get(r['label'], 0) for r in sentiment_results), dtype=np.int8, count=len(sentiment_results))
+    avg_score = float(scores.mean())
     
     suggestion = "Hold"
     if avg_score > 0.3: suggestion = "Buy"
@@ -147,7 +216,7 @@ def scan_market(symbol: str):
     }
 
 @app.get("/scan/betting")
-def scan_betting():
+async def scan_betting():
     print("Received request for /scan/betting")
     events = scanner.get_betting_odds()
     results = []
@@ -189,44 +258,34 @@ async def start_autonomous_trading():
     }
 
 @app.post("/execute/stop")
-def stop_autonomous_trading():
+async def stop_autonomous_trading():
     """Stop autonomous trading agent"""
-    if not auto_agent:
-        return {"status": "error", "message": "Agent not initialized"}
-    
-    auto_agent.stop()
-    if executor:
-        executor.stop_trading()
-    
-    if agent_task:
-        agent_task.cancel()
-        
-    return {
-        "status": "success",
-        "message": "Autonomous trading stopped"
-    }
+    return _stop_agent()
 
 @app.post("/execute/trade")
-def execute_single_trade(symbol: str, signal: str, confidence: float, reason: str = ""):
+async def execute_single_trade(symbol: str, signal: str, confidence: float, reason: str = ""):
     """Execute a single trade based on AI signal"""
     if not executor:
         return {"status": "error", "message": "Executor not initialized"}
     
-    result = executor.execute_trade(symbol, signal, confidence, reason)
+    result = await asyncio.to_thread(executor.execute_trade, symbol, signal, confidence, reason)
     
     if result['status'] == 'success':
-        portfolio.log_trade(result)
+        await asyncio.to_thread(portfolio.log_trade, result)
     
     return result
 
 @app.get("/portfolio/status")
-def get_portfolio_status():
+async def get_portfolio_status():
     """Get current portfolio status"""
     if not executor:
         return {"status": "error", "message": "Executor not initialized"}
     
-    positions = executor.get_positions()
-    account_info = executor.get_account_info()
+    positions, account_info, open_trades = await asyncio.gather(
+        asyncio.to_thread(executor.get_positions),
+        asyncio.to_thread(executor.get_account_info),
+        asyncio.to_thread(portfolio.get_open_trades)
+    )
     current_equity = float(account_info.get('equity', 0))
     risk_metrics = risk_manager.get_risk_metrics(live_positions=positions, current_equity=current_equity)
     
@@ -234,46 +293,56 @@ def get_portfolio_status():
         "account": account_info,
         "positions": positions,
         "risk_metrics": risk_metrics,
-        "open_trades": portfolio.get_open_trades()
+        "open_trades": open_trades
     }
 
 @app.get("/portfolio/performance")
-def get_portfolio_performance():
+async def get_portfolio_performance():
     """Get performance metrics"""
     return {
         "metrics": portfolio.get_performance_metrics(),
-        "daily_summary": portfolio.get_daily_summary()
+        "daily_summary": await asyncio.to_thread(portfolio.get_daily_summary)
     }
 
 @app.get("/portfolio/history")
-def get_trade_history():
-    """Get all closed trades"""
-    return portfolio.get_closed_trades()
+async def get_trade_history(stream: bool = False):
+    """Get all closed trades (stream=true returns NDJSON, one trade per line)"""
+    if stream:
+        lines = (orjson.dumps(t, option=orjson.OPT_APPEND_NEWLINE) for t in portfolio.iter_closed_trades())
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    return await asyncio.to_thread(portfolio.get_closed_trades)
 
 @app.post("/portfolio/close/{symbol}")
-def close_position(symbol: str):
+async def close_position(symbol: str):
     """Close a specific position"""
     if not executor:
         return {"status": "error", "message": "Executor not initialized"}
     
-    result = executor.close_position(symbol)
+    result = await asyncio.to_thread(executor.close_position, symbol)
     
     if result['status'] == 'success':
-        # Get exit price from current positions before closing
-        positions = executor.get_positions()
-        position = next((p for p in positions if p['symbol'] == symbol), None)
-        if position:
-            portfolio.close_trade(symbol, position['current_price'], result['pnl'])
+        # Exit price comes from the position snapshot taken just before closing
+        await asyncio.to_thread(portfolio.close_trade, symbol, result['exit_price'], result['pnl'])
     
     return result
 
 @app.post("/portfolio/close_all")
-def emergency_close_all():
+async def emergency_close_all():
     """Emergency: Close all positions"""
     if not executor:
         return {"status": "error", "message": "Executor not initialized"}
     
-    return executor.close_all_positions()
+    return await asyncio.to_thread(executor.close_all_positions)
+
+@app.get("/wallet/tx/{tx_hash}")
+async def get_wallet_tx_status(tx_hash: str):
+    """Status of an on-chain swap (hash is returned before the broadcast completes)"""
+    return wallet_manager.get_tx_status(tx_hash)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_WORKERS", "1"))
+    )
@@ -0,0 +1,31 @@
+"""
+Numeric kernels for portfolio analytics.
+Compiled with Numba when it is installed, otherwise run as plain Python.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def moments(returns):
+    """(mean, sum of squared deviations) of a 1-D float64 array; seeds Welford's running variance"""
+    n = returns.shape[0]
+    if n == 0:
+        return 0.0, 0.0
+    s = 0.0
+    for i in range(n):
+        s += returns[i]
+    mu = s / n
+    v = 0.0
+    for i in range(n):
+        d = returns[i] - mu
+        v += d * d
+    return mu, v
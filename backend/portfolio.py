@@ -1,7 +1,62 @@
-from datetime import datetime
+from datetime import datetime, timedelta, time as dt_time
 from typing import Dict, List
-import json
+import orjson
 import os
+import numpy as np
+from perf_kernels import moments
+import sqlite3
+import threading
+import time
+
+# Columns returned to API callers (the old JSON record shape)
+TRADE_FIELDS = (
+    "timestamp", "order_id", "symbol", "side", "shares", "entry_price", "stop_loss",
+    "position_value", "confidence", "reason", "status",
+    "exit_price", "exit_timestamp", "pnl", "pnl_pct"
+)
+_CLOSE_FIELDS = ("exit_price", "exit_timestamp", "pnl", "pnl_pct")
+_SELECT_TRADES = f"SELECT {', '.join(TRADE_FIELDS)} FROM trades"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    ts REAL NOT NULL,
+    order_id TEXT,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    shares REAL,
+    entry_price REAL,
+    stop_loss REAL,
+    position_value REAL,
+    confidence REAL,
+    reason TEXT,
+    status TEXT NOT NULL,
+    exit_price REAL,
+    exit_timestamp TEXT,
+    pnl REAL,
+    pnl_pct REAL
+);
+CREATE INDEX IF NOT EXISTS idx_status_symbol ON trades(status, symbol);
+CREATE INDEX IF NOT EXISTS idx_ts ON trades(ts);
+"""
+
+_INSERT_TRADE = """
+INSERT INTO trades (timestamp, ts, order_id, symbol, side, shares, entry_price, stop_loss,
+                    position_value, confidence, reason, status,
+                    exit_price, exit_timestamp, pnl, pnl_pct)
+VALUES (:timestamp, :ts, :order_id, :symbol, :side, :shares, :entry_price, :stop_loss,
+        :position_value, :confidence, :reason, :status,
+        :exit_price, :exit_timestamp, :pnl, :pnl_pct)
+"""
+
+def _row_to_trade(row: sqlite3.Row) -> Dict:
+    trade = dict(row)
+    # Open trades never carried the close fields in the JSON format
+    if trade["status"] == "open":
+        for key in _CLOSE_FIELDS:
+            trade.pop(key, None)
+    return trade
 
 class Portfolio:
     """
@@ -9,29 +64,104 @@ class Portfolio:
     Maintains trade history and calculates performance metrics.
     """
     
-    def __init__(self):
-        self.trades_file = "trade_history.json"
-        self.trades: List[Dict] = self.load_trades()
+    def __init__(self, db_path: str = "trades.db"):
+        self.db_path = db_path
+        self.legacy_trades_file = "trade_history.json"
         self.initial_capital = 10000.0
+        
+        # Autocommit connection shared by the event loop and FastAPI's threadpool
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._import_legacy_trades()
+        
+        # Running performance stats, updated on each close so metrics are O(1) reads.
+        # Seeded once from the closed-trade columns (struct-of-arrays) in the database.
+        self._seed_running_stats(self._load_closed_columns())
+        
+        # Day boundary for get_daily_summary, recomputed only after midnight passes
+        self._today = None
+        self._midnight_ts = 0.0
+        self._next_midnight_ts = 0.0
     
-    def load_trades(self) -> List[Dict]:
-        """Load trade history from file"""
-        if os.path.exists(self.trades_file):
-            try:
-                with open(self.trades_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    def save_trades(self):
-        """Save trade history to file"""
+    def _import_legacy_trades(self):
+        """One-time import of trade_history.json into an empty database"""
+        if not os.path.exists(self.legacy_trades_file):
+            return
+        if self.conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone():
+            return
         try:
-            with open(self.trades_file, 'w') as f:
-                json.dump(self.trades, f, indent=2)
+            with open(self.legacy_trades_file, 'rb') as f:
+                trades = orjson.loads(f.read())
         except Exception as e:
-            print(f"⚠️ Warning: Could not save trade history to file: {e}")
-            print("Ensure the directory is writable or using a persistent volume.")
+            print(f"⚠️ Warning: Could not read legacy trade history: {e}")
+            return
+        
+        rows = []
+        for t in trades:
+            row = {field: t.get(field) for field in TRADE_FIELDS}
+            row["ts"] = datetime.fromisoformat(t["timestamp"]).timestamp()
+            rows.append(row)
+        with self._lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(_INSERT_TRADE, rows)
+            self.conn.execute("COMMIT")
+        print(f"Imported {len(rows)} trades from {self.legacy_trades_file}")
+    
+    def _load_closed_columns(self) -> Dict[str, np.ndarray]:
+        cur = self.conn.cursor()
+        cur.row_factory = None  # plain tuples straight into a 2-D array
+        rows = cur.execute(
+            "SELECT pnl, pnl_pct FROM trades WHERE status = 'closed' ORDER BY id"
+        ).fetchall()
+        table = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        return {"pnl": table[:, 0].copy(), "pnl_pct": table[:, 1].copy()}
+    
+    def _roll_day(self):
+        if time.time() < self._next_midnight_ts:
+            return
+        self._today = datetime.now().date()
+        midnight = datetime.combine(self._today, dt_time.min)
+        self._midnight_ts = midnight.timestamp()
+        self._next_midnight_ts = (midnight + timedelta(days=1)).timestamp()
+    
+    def _seed_running_stats(self, cols: Dict[str, np.ndarray]):
+        pnl = cols["pnl"]
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl <= 0]
+        self._n = int(pnl.size)
+        self._wins = int(wins.size)
+        self._pnl_sum = float(pnl.sum())
+        self._gp = float(wins.sum())
+        self._gl = float(losses.sum())  # <= 0
+        self._best = float(pnl.max()) if pnl.size else float("-inf")
+        self._worst = float(pnl.min()) if pnl.size else float("inf")
+        # Welford state over pnl_pct for the Sharpe ratio
+        mean, m2 = moments(cols["pnl_pct"])
+        self._mean = float(mean)
+        self._m2 = float(m2)
+    
+    def _record_close(self, pnl: float, pnl_pct: float):
+        self._n += 1
+        self._pnl_sum += pnl
+        if pnl > 0:
+            self._wins += 1
+            self._gp += pnl
+        else:
+            self._gl += pnl
+        self._best = max(self._best, pnl)
+        self._worst = min(self._worst, pnl)
+        delta = pnl_pct - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (pnl_pct - self._mean)
+    
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [_row_to_trade(r) for r in rows]
     
     def log_trade(self, trade_data: Dict):
         """
@@ -40,8 +170,10 @@ class Portfolio:
         Args:
             trade_data: Trade details from executor
         """
+        now = datetime.now()
         trade_record = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
+            "ts": now.timestamp(),
             "order_id": trade_data.get("order_id"),
             "symbol": trade_data.get("symbol"),
             "side": trade_data.get("side"),
@@ -51,11 +183,15 @@ class Portfolio:
             "position_value": trade_data.get("position_value"),
             "confidence": trade_data.get("confidence"),
             "reason": trade_data.get("reason"),
-            "status": "open"
+            "status": "open",
+            "exit_price": None,
+            "exit_timestamp": None,
+            "pnl": None,
+            "pnl_pct": None
         }
         
-        self.trades.append(trade_record)
-        self.save_trades()
+        with self._lock:
+            self.conn.execute(_INSERT_TRADE, trade_record)
         print(f"Trade logged: {trade_record['symbol']} {trade_record['side']} x{trade_record['shares']}")
     
     def close_trade(self, symbol: str, exit_price: float, pnl: float):
@@ -67,25 +203,49 @@ class Portfolio:
             exit_price: Exit price
             pnl: Profit/Loss
         """
-        # Find the most recent open trade for this symbol
-        for trade in reversed(self.trades):
-            if trade['symbol'] == symbol and trade['status'] == 'open':
-                trade['status'] = 'closed'
-                trade['exit_price'] = exit_price
-                trade['exit_timestamp'] = datetime.now().isoformat()
-                trade['pnl'] = pnl
-                trade['pnl_pct'] = (pnl / trade['position_value']) * 100
-                self.save_trades()
-                print(f"Trade closed: {symbol}, P&L: ${pnl:,.2f} ({trade['pnl_pct']:.2f}%)")
-                break
+        with self._lock:
+            # Find the most recent open trade for this symbol
+            row = self.conn.execute(
+                "SELECT id, position_value FROM trades WHERE status = 'open' AND symbol = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (symbol,)
+            ).fetchone()
+            if row is None:
+                return
+            pnl_pct = (pnl / row["position_value"]) * 100
+            self.conn.execute(
+                "UPDATE trades SET status = 'closed', exit_price = ?, exit_timestamp = ?, pnl = ?, pnl_pct = ? "
+                "WHERE id = ?",
+                (exit_price, datetime.now().isoformat(), pnl, pnl_pct, row["id"])
+            )
+            self._record_close(pnl, pnl_pct)
+        print(f"Trade closed: {symbol}, P&L: ${pnl:,.2f} ({pnl_pct:.2f}%)")
     
     def get_open_trades(self) -> List[Dict]:
         """Get all currently open trades"""
-        return [t for t in self.trades if t['status'] == 'open']
+        return self._query(f"{_SELECT_TRADES} WHERE status = 'open' ORDER BY id")
     
     def get_closed_trades(self) -> List[Dict]:
         """Get all closed trades"""
-        return [t for t in self.trades if t['status'] == 'closed']
+        return self._query(f"{_SELECT_TRADES} WHERE status = 'closed' ORDER BY id")
+    
+    def iter_closed_trades(self, chunk_size: int = 500):
+        """Yield closed trades in order, fetched chunk by chunk (for streaming responses)"""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT id, {', '.join(TRADE_FIELDS)} FROM trades "
+                    "WHERE status = 'closed' AND id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            for row in rows:
+                trade = _row_to_trade(row)
+                del trade["id"]
+                yield trade
     
     def get_performance_metrics(self) -> Dict:
         """
@@ -94,9 +254,12 @@ class Portfolio:
         Returns:
             Performance statistics
         """
-        closed_trades = self.get_closed_trades()
+        with self._lock:
+            n, wins, pnl_sum = self._n, self._wins, self._pnl_sum
+            gross_profit, gl = self._gp, self._gl
+            best, worst, avg_return, m2 = self._best, self._worst, self._mean, self._m2
         
-        if not closed_trades:
+        if n == 0:
             return {
                 "total_trades": 0,
                 "win_rate": 0.0,
@@ -108,48 +271,40 @@ class Portfolio:
             }
         
         # Calculate basic metrics
-        total_trades = len(closed_trades)
-        winning_trades = [t for t in closed_trades if t['pnl'] > 0]
-        losing_trades = [t for t in closed_trades if t['pnl'] <= 0]
-        
-        win_rate = (len(winning_trades) / total_trades) * 100 if total_trades > 0 else 0
-        total_pnl = sum(t['pnl'] for t in closed_trades)
+        losses = n - wins
+        win_rate = (wins / n) * 100
         
-        avg_win = sum(t['pnl'] for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = abs(sum(t['pnl'] for t in losing_trades) / len(losing_trades)) if losing_trades else 0
+        avg_win = gross_profit / wins if wins else 0.0
+        avg_loss = abs(gl / losses) if losses else 0.0
         
         # Profit factor
-        gross_profit = sum(t['pnl'] for t in winning_trades)
-        gross_loss = abs(sum(t['pnl'] for t in losing_trades))
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+        gross_loss = abs(gl)
+        profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0.0
         
         # Simplified Sharpe ratio (assuming risk-free rate = 0)
-        returns = [t['pnl_pct'] for t in closed_trades]
-        avg_return = sum(returns) / len(returns) if returns else 0
-        std_dev = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5 if len(returns) > 1 else 0
-        sharpe_ratio = avg_return / std_dev if std_dev > 0 else 0
+        std_dev = (m2 / n) ** 0.5 if n > 1 else 0.0
+        sharpe_ratio = avg_return / std_dev if std_dev > 0 else 0.0
         
         return {
-            "total_trades": total_trades,
-            "winning_trades": len(winning_trades),
-            "losing_trades": len(losing_trades),
+            "total_trades": n,
+            "winning_trades": wins,
+            "losing_trades": losses,
             "win_rate": round(win_rate, 2),
-            "total_pnl": round(total_pnl, 2),
+            "total_pnl": round(pnl_sum, 2),
             "avg_win": round(avg_win, 2),
             "avg_loss": round(avg_loss, 2),
             "profit_factor": round(profit_factor, 2),
             "sharpe_ratio": round(sharpe_ratio, 2),
-            "best_trade": max(closed_trades, key=lambda x: x['pnl'])['pnl'] if closed_trades else 0,
-            "worst_trade": min(closed_trades, key=lambda x: x['pnl'])['pnl'] if closed_trades else 0
+            "best_trade": best,
+            "worst_trade": worst
         }
     
     def get_daily_summary(self) -> Dict:
         """Get today's trading summary"""
-        today = datetime.now().date()
-        today_trades = [
-            t for t in self.trades
-            if datetime.fromisoformat(t['timestamp']).date() == today
-        ]
+        self._roll_day()
+        today = self._today
+        # Range scan on the ts index instead of parsing every ISO timestamp
+        today_trades = self._query(f"{_SELECT_TRADES} WHERE ts >= ? ORDER BY id", (self._midnight_ts,))
         
         closed_today = [t for t in today_trades if t['status'] == 'closed']
         daily_pnl = sum(t['pnl'] for t in closed_today)
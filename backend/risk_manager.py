@@ -1,10 +1,30 @@
 import os
+import time
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 load_dotenv()
 
+@lru_cache(maxsize=256)
+def is_crypto(symbol: str) -> bool:
+    """Crypto pairs look like BTC/USD (or BTCUSD as Alpaca reports positions).
+    Shared by sizing and order routing so both agree on fractional vs whole shares."""
+    return "/" in symbol or symbol.endswith("USD")
+
+@dataclass(slots=True, frozen=True)
+class RiskSnapshot:
+    """Derived risk state, recomputed only when the underlying state changes"""
+    current_capital: float
+    daily_pnl: float
+    daily_loss_pct: float
+    daily_loss_limit: float
+    portfolio_exposure_pct: float
+    open_positions: int
+    can_trade: bool
+
 class RiskManager:
     """
     Comprehensive risk management system for autonomous trading.
@@ -30,21 +50,61 @@ class RiskManager:
         self.max_position_size_pct = get_env_float('MAX_POSITION_SIZE_PCT', 5.0)
         self.max_stop_loss_pct = get_env_float('MAX_STOP_LOSS_PCT', 3.0)
         
+        # Position sizing constants (depend only on configuration)
+        self._max_pos_frac = self.max_position_size_pct / 100
+        self._kelly_cap = 0.25  # Cap at 25% (quarter Kelly)
+        self._inv_er = 1.0 / 1.5  # Assume 1.5:1 reward/risk ratio
+        
         # Track daily performance
         self.daily_start_capital = None
         self.daily_pnl = 0.0
         self.last_reset_date = datetime.now().date()
+        # Local-time day index, so the hot path compares integers instead of building dates
+        self._utc_offset = time.localtime().tm_gmtoff
+        self._day_idx = self._current_day_idx()
         
         # Position tracking
         self.open_positions: Dict[str, float] = {}  # symbol -> position_value
         
+        self._snapshot = self._compute_snapshot()
+    
+    def _compute_snapshot(self) -> RiskSnapshot:
+        current_capital = self.get_current_capital()
+        # Before the first equity sync there is no daily baseline yet
+        start_capital = self.daily_start_capital if self.daily_start_capital is not None else current_capital
+        daily_loss_pct = ((start_capital - current_capital) / start_capital) * 100 if start_capital else 0.0
+        return RiskSnapshot(
+            current_capital=current_capital,
+            daily_pnl=self.daily_pnl,
+            daily_loss_pct=daily_loss_pct,
+            daily_loss_limit=self.max_daily_loss_pct,
+            portfolio_exposure_pct=self.get_portfolio_exposure(),
+            open_positions=len(self.open_positions),
+            can_trade=daily_loss_pct < self.max_daily_loss_pct
+        )
+    
+    def _refresh_snapshot(self):
+        self._snapshot = self._compute_snapshot()
+    
+    def get_snapshot(self) -> RiskSnapshot:
+        """Latest risk snapshot (after rolling over the day if needed)"""
+        self.reset_daily_limits()
+        return self._snapshot
+        
+    def _current_day_idx(self) -> int:
+        return int((time.time() + self._utc_offset) // 86400)
+    
     def reset_daily_limits(self):
         """Reset daily tracking at market open"""
-        today = datetime.now().date()
-        if today > self.last_reset_date:
+        day_idx = self._current_day_idx()
+        if day_idx > self._day_idx:
             self.daily_start_capital = self.get_current_capital()
             self.daily_pnl = 0.0
-            self.last_reset_date = today
+            self._day_idx = day_idx
+            self.last_reset_date = datetime.now().date()
+            # Pick up DST changes once per day
+            self._utc_offset = time.localtime().tm_gmtoff
+            self._refresh_snapshot()
             print(f"Daily limits reset. Starting capital: ${self.daily_start_capital:,.2f}")
     
     def get_current_capital(self) -> float:
@@ -58,14 +118,10 @@ class RiskManager:
         Check if trading is allowed based on daily loss limits.
         Returns: (allowed, reason)
         """
-        self.reset_daily_limits()
+        snapshot = self.get_snapshot()
         
-        current_capital = self.get_current_capital()
-        daily_loss = self.daily_start_capital - current_capital
-        daily_loss_pct = (daily_loss / self.daily_start_capital) * 100
-        
-        if daily_loss_pct >= self.max_daily_loss_pct:
-            return False, f"Daily loss limit reached: {daily_loss_pct:.2f}% (max: {self.max_daily_loss_pct}%)"
+        if not snapshot.can_trade:
+            return False, f"Daily loss limit reached: {snapshot.daily_loss_pct:.2f}% (max: {self.max_daily_loss_pct}%)"
         
         return True, "Trading allowed"
     
@@ -83,24 +139,17 @@ class RiskManager:
         """
         current_capital = self.get_current_capital()
         
-        # Kelly Criterion: f = (bp - q) / b
+        # Kelly Criterion: f = (bp - q) / b = p - q / b
         # where b = odds, p = win probability, q = 1-p
         # Simplified: use confidence as win probability
         win_prob = signal_confidence
-        loss_prob = 1 - win_prob
-        expected_return = 1.5  # Assume 1.5:1 reward/risk ratio
-        
-        kelly_fraction = (expected_return * win_prob - loss_prob) / expected_return
-        kelly_fraction = max(0, min(kelly_fraction, 0.25))  # Cap at 25% (quarter Kelly)
+        kelly_fraction = max(0.0, min(win_prob - (1 - win_prob) * self._inv_er, self._kelly_cap))
         
         # Apply maximum position size limit
-        max_position_value = current_capital * (self.max_position_size_pct / 100)
-        kelly_position_value = current_capital * kelly_fraction
-        
-        position_value = min(kelly_position_value, max_position_value)
+        position_value = current_capital * min(kelly_fraction, self._max_pos_frac)
         
         # Crypto symbols often require fractional shares
-        if "/" in symbol or "USD" in symbol:
+        if is_crypto(symbol):
             shares = round(position_value / current_price, 4) # 4 decimals for crypto
         else:
             shares = int(position_value / current_price) # Integer for stocks (default)
@@ -165,12 +214,14 @@ class RiskManager:
     def update_position(self, symbol: str, position_value: float):
         """Track open position"""
         self.open_positions[symbol] = position_value
+        self._refresh_snapshot()
     
     def close_position(self, symbol: str, pnl: float):
         """Close position and update P&L"""
         if symbol in self.open_positions:
             del self.open_positions[symbol]
         self.daily_pnl += pnl
+        self._refresh_snapshot()
         print(f"Position closed: {symbol}, P&L: ${pnl:,.2f}, Total Daily P&L: ${self.daily_pnl:,.2f}")
     
     def get_portfolio_exposure(self) -> float:
@@ -187,6 +238,10 @@ class RiskManager:
         Get current risk metrics for monitoring.
         If live_positions is provided, it syncs the internal state with Alpaca.
         """
+        if current_equity is None and live_positions is None:
+            # Read-only poll: serve the cached snapshot
+            return asdict(self.get_snapshot())
+        
         # Sync with live equity if provided to calculate real daily P&L
         if current_equity is not None:
             if self.daily_start_capital is None:
@@ -199,20 +254,9 @@ class RiskManager:
 
             self.daily_pnl = current_equity - self.daily_start_capital
         
-        current_capital = self.get_current_capital()
-        
         # Sync with live positions if provided
         if live_positions is not None:
             self.open_positions = {p['symbol']: p['market_value'] for p in live_positions}
         
-        daily_loss_pct = ((self.daily_start_capital - current_capital) / self.daily_start_capital) * 100
-        
-        return {
-            "current_capital": current_capital,
-            "daily_pnl": self.daily_pnl,
-            "daily_loss_pct": daily_loss_pct,
-            "daily_loss_limit": self.max_daily_loss_pct,
-            "portfolio_exposure_pct": self.get_portfolio_exposure(),
-            "open_positions": len(self.open_positions),
-            "can_trade": self.can_trade()[0]
-        }
+        self._refresh_snapshot()
+        return asdict(self._snapshot)
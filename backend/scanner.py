@@ -1,4 +1,5 @@
-import requests
+import httpx
+from async_lru import alru_cache
 import os
 from dotenv import load_dotenv
 
@@ -10,8 +11,17 @@ class MarketScanner:
     def __init__(self):
         self.stock_base_url = "https://www.alphavantage.co/query"
         self.crypto_base_url = "https://api.coingecko.com/api/v3"
+        # One pooled HTTP/2 client for every upstream call; closed on app shutdown
+        self._client = httpx.AsyncClient(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
 
-    def get_stock_data(self, symbol: str):
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def get_stock_data(self, symbol: str):
         if not ALPHA_VANTAGE_API_KEY or ALPHA_VANTAGE_API_KEY == "your_key_here":
             return {"Note": "Using demo data. Please provide API key for live stock scanning."}
         
@@ -21,26 +31,33 @@ class MarketScanner:
             "interval": "5min",
             "apikey": ALPHA_VANTAGE_API_KEY
         }
-        response = requests.get(self.stock_base_url, params=params)
+        response = await self._client.get(self.stock_base_url, params=params)
         return response.json()
 
-    def get_crypto_prices_bulk(self, coin_ids: list):
+    async def get_crypto_prices_bulk(self, coin_ids: list):
+        try:
+            return await self._fetch_crypto_prices(",".join(coin_ids))
+        except Exception as e:
+            print(f"Error fetching crypto prices: {e}")
+            return {}
+
+    @alru_cache(maxsize=32, ttl=15)
+    async def _fetch_crypto_prices(self, ids: str):
+        # CoinGecko's free tier is rate limited; reuse results for 15s. Errors (incl. 429/5xx,
+        # via raise_for_status) raise out of here, so alru_cache doesn't cache them
         url = f"{self.crypto_base_url}/simple/price"
         params = {
-            "ids": ",".join(coin_ids),
+            "ids": ids,
             "vs_currencies": "usd",
             "include_24hr_change": "true"
         }
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching crypto prices: {e}")
-            return {}
+        response = await self._client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
 
-    def get_crypto_price(self, coin_id: str):
+    async def get_crypto_price(self, coin_id: str):
         # Kept for backward compatibility, uses bulk method internally
-        data = self.get_crypto_prices_bulk([coin_id])
+        data = await self.get_crypto_prices_bulk([coin_id])
         return data
 
     def get_betting_odds(self, sport: str = "upcoming"):
@@ -52,7 +69,7 @@ class MarketScanner:
             {"event": "Super Bowl LVIII", "odds_home": 1.90, "odds_away": 1.90, "sport": "Football"}
         ]
 
-    def get_bond_data(self):
+    async def get_bond_data(self):
         # Alpha Vantage provides some Treasury yield data
         params = {
             "function": "TREASURY_YIELD",
@@ -60,5 +77,5 @@ class MarketScanner:
             "maturity": "10year",
             "apikey": ALPHA_VANTAGE_API_KEY
         }
-        response = requests.get(self.stock_base_url, params=params)
+        response = await self._client.get(self.stock_base_url, params=params)
         return response.json()
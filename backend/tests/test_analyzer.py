@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["USE_ML_ANALYSIS"] = "false"
+
+from analyzer import SentimentAnalyzer
+
+# Scores of the original substring-based keyword fallback
+BASELINE = {
+    "Bitcoin surges to record": 1,
+    "ETH gains 5% as profits rise": 2,
+    "Stocks drops after losses": -2,
+}
+
+
+def test_keyword_fallback_matches_baseline():
+    analyzer = SentimentAnalyzer()
+    results = analyzer.analyze_news(list(BASELINE))
+    assert [r["score"] for r in results] == list(BASELINE.values())
+
+
+def test_vectorized_path_matches_regex_path():
+    analyzer = SentimentAnalyzer()
+    texts = list(BASELINE) * (analyzer.VECTORIZE_MIN_TEXTS // len(BASELINE) + 1)
+    assert [r["score"] for r in analyzer.analyze_news(texts)] == [BASELINE[t] for t in texts]
@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wallet_manager import WalletManager
+
+
+def _endpoint(send):
+    return SimpleNamespace(eth=SimpleNamespace(send_raw_transaction=send))
+
+
+def _manager(*sends):
+    # Only the broadcast state is needed; skip __init__ (credentials, RPC clients)
+    wm = WalletManager.__new__(WalletManager)
+    wm._providers = [_endpoint(s) for s in sends]
+    wm._broadcast_pool = ThreadPoolExecutor(max_workers=len(sends))
+    return wm
+
+
+def test_broadcast_already_known_on_one_endpoint_counts_as_sent():
+    release = threading.Event()
+
+    def known(raw):
+        raise ValueError("already known")
+
+    def accepts(raw):
+        release.wait(1) # Let the already-known reply land first
+        return b"\xab" * 32
+
+    wm = _manager(known, accepts)
+    try:
+        assert wm._broadcast(b"raw") is None
+    finally:
+        release.set()
+        wm._broadcast_pool.shutdown()
+
+
+def test_broadcast_raises_when_every_endpoint_fails():
+    def rejects(raw):
+        raise ValueError("insufficient funds")
+
+    wm = _manager(rejects, rejects)
+    try:
+        with pytest.raises(ValueError, match="insufficient funds"):
+            wm._broadcast(b"raw")
+    finally:
+        wm._broadcast_pool.shutdown()
@@ -1,11 +1,220 @@
+import asyncio
+import logging
+import multiprocessing
 import os
+import re
+import statistics
+import threading
+import time
 from dotenv import load_dotenv
-from web3 import Web3
-from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Must run before eth_account/eth_keys are imported: pin signing to libsecp256k1,
+# since eth-keys' other backend is pure Python and 100-1000x slower
+try:
+    import coincurve
+    COINCURVE_AVAILABLE = True
+    os.environ.setdefault("ECC_BACKEND_CLASS", "eth_keys.backends.CoinCurveECCBackend")
+except ImportError:
+    COINCURVE_AVAILABLE = False
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from eth_utils import keccak
+from web3 import AsyncHTTPProvider, AsyncIPCProvider, AsyncWeb3, Web3
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import json
 
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 load_dotenv()
 
+logger = logging.getLogger("wallet_manager")
+if not COINCURVE_AVAILABLE:
+    logger.warning("coincurve not installed; signing uses the slow pure-Python secp256k1 backend")
+
+WEI_PER_ETH = 10 ** 18
+BALANCE_TTL = 2.0 # Seconds a balance is served from cache
+BALANCE_REFRESH_AGE = 1.5 # Async reads past this age refresh in the background
+FEE_HISTORY_TTL = 6.0 # Seconds; one eth_feeHistory serves every swap within half a block
+NONCE_ERRORS = ("nonce too low",)
+# A node already holds this exact signed tx, i.e. it was broadcast; re-signing would send a second swap
+KNOWN_TX_ERRORS = ("already known", "known transaction")
+RECEIPT_TIMEOUT = 180 # Seconds to watch for a queued tx's receipt
+MAX_TRACKED_TXS = 1024 # Receipt futures kept for wait_for_receipt
+
+_ADDRESS_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+_PRIVATE_KEY_RE = re.compile(r'^(0x)?[0-9a-fA-F]{64}$')
+
+# Uniswap V2 (router, WETH) per chain id; router swaps on any other chain are refused
+UNISWAP_V2 = {
+    1: ("0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"), # Ethereum mainnet
+}
+SWAP_GAS_LIMIT = 250000
+SWAP_DEADLINE_SECS = 300
+# Trimmed router ABI as a literal (no JSON parsing); only the entry points we call
+ROUTER_ABI = (
+    {
+        "name": "swapExactETHForTokens",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": (
+            {"name": "amountOutMin", "type": "uint256"},
+            {"name": "path", "type": "address[]"},
+            {"name": "to", "type": "address"},
+            {"name": "deadline", "type": "uint256"},
+        ),
+        "outputs": ({"name": "amounts", "type": "uint256[]"},),
+    },
+)
+
+# Canonical Multicall3 (same address on every major EVM chain)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = (
+    {
+        "name": "aggregate3",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": ({
+            "name": "calls", "type": "tuple[]",
+            "components": (
+                {"name": "target", "type": "address"},
+                {"name": "allowFailure", "type": "bool"},
+                {"name": "callData", "type": "bytes"},
+            ),
+        },),
+        "outputs": ({
+            "name": "returnData", "type": "tuple[]",
+            "components": (
+                {"name": "success", "type": "bool"},
+                {"name": "returnData", "type": "bytes"},
+            ),
+        },),
+    },
+)
+ERC20_ABI = (
+    {
+        "name": "balanceOf",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": ({"name": "owner", "type": "address"},),
+        "outputs": ({"name": "", "type": "uint256"},),
+    },
+)
+
+# One keep-alive session (and one provider per URL) per process, so every RPC
+# reuses pooled connections instead of paying a fresh TCP+TLS handshake
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.1))
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+@lru_cache(maxsize=None)
+def _http_provider(url: str) -> Web3.HTTPProvider:
+    return Web3.HTTPProvider(url, session=_SESSION, request_kwargs={'timeout': 10})
+
+@lru_cache(maxsize=4096)
+def _checksum(addr: str) -> str:
+    """EIP-55 checksum (a Keccak per address), computed once per distinct address"""
+    return Web3.to_checksum_address(addr)
+
+def _ipc_path(url: str) -> Optional[str]:
+    """Socket path for ipc://... or file://....ipc URLs, else None"""
+    if url.startswith('ipc://'):
+        return url[len('ipc://'):]
+    if url.startswith('file://') and url.endswith('.ipc'):
+        return url[len('file://'):]
+    return None
+
+def _provider(url: str):
+    # A co-located node over a Unix socket skips TCP/TLS entirely (~100us vs ~1ms per call)
+    path = _ipc_path(url)
+    return Web3.IPCProvider(path) if path else _http_provider(url)
+
+def _async_provider(url: str):
+    path = _ipc_path(url)
+    return AsyncIPCProvider(path) if path else AsyncHTTPProvider(url, request_kwargs={'timeout': 10})
+
+if MSGSPEC_AVAILABLE:
+    class EthCallResponse(msgspec.Struct):
+        result: Optional[str] = None
+        error: Optional[dict] = None
+
+    _RPC_DECODER = msgspec.json.Decoder(EthCallResponse)
+
+# Async swaps sign in worker processes, so the event loop's process never runs ECDSA even
+# if the pure-Python backend is in use (sign_many's threads rely on coincurve dropping the GIL).
+# Built on first use with forkserver/spawn: forking a process that already runs threads and
+# an event loop can deadlock the child on a lock copied mid-acquire.
+_SIGN_POOL: Optional[ProcessPoolExecutor] = None
+_SIGN_POOL_LOCK = threading.Lock()
+
+def _get_sign_pool() -> ProcessPoolExecutor:
+    global _SIGN_POOL
+    if _SIGN_POOL is None:
+        with _SIGN_POOL_LOCK:
+            if _SIGN_POOL is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _SIGN_POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(method))
+    return _SIGN_POOL
+
+def shutdown_sign_pool():
+    """Stop the signing workers (call on app shutdown)"""
+    global _SIGN_POOL
+    with _SIGN_POOL_LOCK:
+        if _SIGN_POOL is not None:
+            _SIGN_POOL.shutdown(cancel_futures=True)
+            _SIGN_POOL = None
+
+@lru_cache(maxsize=4)
+def _local_account(private_key: str):
+    """Parse the key once per process instead of on every signature"""
+    return Account.from_key(private_key)
+
+def _sign_transaction_worker(private_key: str, tx: Dict) -> bytes:
+    return bytes(_local_account(private_key).sign_transaction(tx).raw_transaction)
+
+def _sign_message_worker(private_key: str, message: str) -> str:
+    return _local_account(private_key).sign_message(encode_defunct(text=message)).signature.hex()
+
+VERIFY_CHUNK = 256 # Signatures per pool task; amortizes dispatch overhead
+# libsecp256k1 releases the GIL, so verification scales across threads
+_VERIFY_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+def _recover_address(message: str, signature: bytes) -> Optional[bytes]:
+    """20-byte signer address of an EIP-191 personal message, or None if the signature is malformed"""
+    try:
+        if not COINCURVE_AVAILABLE:
+            return bytes.fromhex(Account.recover_message(encode_defunct(text=message), signature=signature)[2:])
+        data = message.encode()
+        digest = keccak(b"\x19Ethereum Signed Message:\n" + str(len(data)).encode() + data)
+        v = signature[64]
+        recoverable = signature[:64] + bytes([v - 27 if v >= 27 else v])
+        pub = coincurve.PublicKey.from_signature_and_message(recoverable, digest, hasher=None)
+        return keccak(pub.format(compressed=False)[1:])[-20:]
+    except Exception:
+        return None
+
+def _verify_chunk(expected: bytes, msgs_sigs: List[Tuple[str, bytes]]) -> List[bool]:
+    return [_recover_address(msg, bytes(sig)) == expected for msg, sig in msgs_sigs]
+
+def _already_known(e: Exception) -> bool:
+    return any(m in str(e).lower() for m in KNOWN_TX_ERRORS)
+
+def _estimate_fees(fee_history) -> Tuple[int, int]:
+    """EIP-1559 (maxFeePerGas, maxPriorityFeePerGas) from an eth_feeHistory result"""
+    base = fee_history['baseFeePerGas'][-1] # Pending block's base fee
+    tip = int(statistics.median(fee_history['reward'][-1]))
+    return base * 2 + tip, tip # 2x base survives several full blocks of base fee growth
+
 class WalletManager:
     """
     Manages crypto wallet connections and on-chain interactions.
@@ -15,49 +224,381 @@ class WalletManager:
     def __init__(self):
         self.private_key = os.getenv('CRYPTO_PRIVATE_KEY')
         self.rpc_url = os.getenv('CRYPTO_RPC_URL', 'https://cloudflare-eth.com')
+        # Optional extra endpoints; signed txs are broadcast to all of them and the first answer wins
+        self.rpc_urls = [u.strip() for u in os.getenv('CRYPTO_RPC_URLS', '').split(',') if u.strip()] or [self.rpc_url]
+        # Prefer a local node's IPC socket when one is configured and present
+        ipc_path = os.getenv('CRYPTO_IPC_PATH')
+        if ipc_path and os.path.exists(ipc_path):
+            self.rpc_urls[0] = f"ipc://{ipc_path}"
+        self.rpc_url = self.rpc_urls[0]
         self.wallet_address = os.getenv('CRYPTO_WALLET_ADDRESS')
         
         if not self.private_key or not self.wallet_address:
-            print("Warning: Crypto credentials not found. DeFi trading disabled.")
+            logger.warning("Crypto credentials not found. DeFi trading disabled.")
             self.w3 = None
+            self.aw3 = None
+            self.account = None
+            return
+
+        # Fail fast on malformed credentials rather than on the first signed tx
+        if not _PRIVATE_KEY_RE.match(self.private_key) or not _ADDRESS_RE.match(self.wallet_address):
+            logger.warning("Malformed crypto credentials. DeFi trading disabled.")
+            self.w3 = None
+            self.aw3 = None
             self.account = None
             return
 
         try:
-            self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-            if self.w3.is_connected():
-                print(f"Connected to Blockchain: {self.rpc_url}")
-                # Verify address checksum
-                self.wallet_address = self.w3.to_checksum_address(self.wallet_address)
-            else:
-                print("Failed to connect to Blockchain RPC")
-                self.w3 = None
+            self.account = _local_account(self.private_key)
+            # For sign_many: coincurve releases the GIL while signing, so threads overlap across cores
+            self._sign_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count()))
+            # No connectivity probe: a dead node surfaces on the first real RPC instead of delaying startup
+            self.w3 = Web3(_provider(self.rpc_url))
+            logger.info("Using Blockchain RPC: %s", self.rpc_url)
+            # Verify address checksum (local Keccak, no RPC)
+            self.wallet_address = _checksum(self.wallet_address)
         except Exception as e:
-            print(f"Error initializing WalletManager: {e}")
+            logger.error("Error initializing WalletManager: %s", e)
             self.w3 = None
+            self.account = None
+
+        # Async client for event-loop callers; aiohttp sessions are loop-bound, so one per instance
+        self.aw3 = AsyncWeb3(_async_provider(self.rpc_url)) if self.w3 else None
+        self._providers = [self.w3] + [Web3(_provider(u)) for u in self.rpc_urls[1:]]
+        self._async_providers = [self.aw3] + [AsyncWeb3(_async_provider(u)) for u in self.rpc_urls[1:]]
+        self._async_connect: Optional[asyncio.Future] = None
+        # Background broadcast queue; created on first async swap since it needs the running loop
+        self._tx_queue: Optional[asyncio.Queue] = None
+        self._broadcaster_task: Optional[asyncio.Task] = None
+        self._receipts: Dict[str, asyncio.Future] = {}
+        self._receipt_tasks: Set[asyncio.Task] = set() # Held so watchers aren't GC'd mid-wait
+        self._bal_cache: Dict[str, Tuple[float, Dict]] = {} # address -> (monotonic timestamp, result)
+        self._bal_task: Optional[asyncio.Task] = None # Background refresh; held so it isn't GC'd mid-run
+        # Built once: contract construction parses the ABI and builds the encoders
+        self._router = self.w3.eth.contract(abi=ROUTER_ABI) if self.w3 else None # Address depends on the chain
+        self._multicall = self.w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI) if self.w3 else None
+        self._erc20 = self.w3.eth.contract(abi=ERC20_ABI) if self.w3 else None
+        # Hot-path reads skip web3's formatter chain when msgspec can decode the raw response
+        self._fast_mode = MSGSPEC_AVAILABLE and self.rpc_url.startswith(('http://', 'https://'))
+        self._broadcast_pool = ThreadPoolExecutor(max_workers=len(self._providers)) if len(self._providers) > 1 else None
+
+        self._chain_id: Optional[int] = None
+        self._fee_cache: Tuple[float, Tuple[int, int]] = (0.0, (0, 0)) # (monotonic timestamp, (maxFee, tip))
+        # Local nonce counter shared by the sync and async paths; assumes this process
+        # is the only signer for the address. Nonces are reserved under the lock.
+        self._next_nonce: Optional[int] = None
+        self._nonce_epoch = 0 # Bumped on every resync; queued txs signed under an older epoch are dropped
+        self._nonce_lock = threading.Lock()
+
+    async def _ensure_async_connected(self):
+        """Persistent (IPC) async providers must connect on the running loop before first use"""
+        if self._async_connect is None:
+            self._async_connect = asyncio.ensure_future(asyncio.gather(*[
+                w.provider.connect() for w in self._async_providers if isinstance(w.provider, AsyncIPCProvider)
+            ]))
+        try:
+            await self._async_connect
+        except Exception:
+            self._async_connect = None # Don't cache the failure; the next call reconnects
+            raise
+
+    async def _broadcaster(self):
+        """Drain the tx queue in order so execute_swap_async can return once the tx is signed"""
+        while True:
+            raw_tx, tx_hex, epoch = await self._tx_queue.get()
+            if epoch != self._nonce_epoch:
+                # Signed before a resync: its nonce sits behind a failed tx and would never be mined
+                self._fail_tx(tx_hex, RuntimeError("Dropped: an earlier transaction failed to broadcast"))
+                continue
+            try:
+                await self._broadcast_async(raw_tx)
+            except Exception as e:
+                # The hash was already handed out, so there's no re-sign/retry here; surface it instead
+                logger.error("Broadcast failed for %s: %s", tx_hex, e)
+                self._broadcast_failed(e, attempt=1)
+                self._fail_tx(tx_hex, e)
+                continue
+            task = asyncio.create_task(self._watch_receipt(tx_hex))
+            self._receipt_tasks.add(task)
+            task.add_done_callback(self._receipt_tasks.discard)
+
+    def _fail_tx(self, tx_hex: str, e: Exception):
+        fut = self._receipts.get(tx_hex)
+        if fut and not fut.done():
+            fut.set_exception(e)
+
+    async def _watch_receipt(self, tx_hex: str):
+        fut = self._receipts.get(tx_hex)
+        try:
+            receipt = await self.aw3.eth.wait_for_transaction_receipt(tx_hex, timeout=RECEIPT_TIMEOUT)
+            if fut and not fut.done():
+                fut.set_result(dict(receipt))
+        except Exception as e:
+            if fut and not fut.done():
+                fut.set_exception(e)
+
+    async def wait_for_receipt(self, tx_hash: str) -> Optional[Dict]:
+        """Await the receipt of a tx queued by execute_swap_async (None if it isn't tracked)"""
+        fut = self._receipts.get(tx_hash)
+        if fut is None:
+            return None
+        return await asyncio.shield(fut)
+
+    def get_tx_status(self, tx_hash: str) -> Dict:
+        """Non-blocking status of a tx queued by execute_swap_async"""
+        if not self.w3:
+            return {"status": "error", "message": "Wallet not connected"}
+        tx_hash = tx_hash.lower()
+        fut = self._receipts.get(tx_hash)
+        if fut is None:
+            return {"status": "unknown", "tx_hash": tx_hash}
+        if not fut.done():
+            return {"status": "pending", "tx_hash": tx_hash}
+        if fut.cancelled() or fut.exception():
+            return {"status": "failed", "tx_hash": tx_hash, "message": str(fut.exception()) if not fut.cancelled() else "cancelled"}
+        receipt = fut.result()
+        return {
+            "status": "confirmed" if receipt.get("status") == 1 else "reverted",
+            "tx_hash": tx_hash,
+            "block_number": receipt.get("blockNumber")
+        }
+
+    def _pending_calls(self, eth) -> Dict:
+        """RPC calls needed to fill whatever tx params aren't cached (uncalled, keyed by param)"""
+        calls = {}
+        if self._next_nonce is None:
+            calls['nonce'] = lambda: eth.get_transaction_count(self.wallet_address, 'pending')
+        if time.monotonic() - self._fee_cache[0] > FEE_HISTORY_TTL:
+            calls['fees'] = lambda: eth.fee_history(4, 'latest', [25, 50, 75])
+        if self._chain_id is None:
+            calls['chain'] = lambda: eth.chain_id
+        return calls
+
+    def _reserve_tx_params(self, fetched: Dict, now: float) -> Optional[Tuple[int, Tuple[int, int], int, int]]:
+        """Store fetched params and reserve the next nonce. Returns None if the nonce was reset meanwhile."""
+        if 'fees' in fetched:
+            self._fee_cache = (now, _estimate_fees(fetched['fees']))
+        if 'chain' in fetched:
+            self._chain_id = fetched['chain'] # Immutable for the lifetime of the process
+        with self._nonce_lock:
+            if self._next_nonce is None:
+                if 'nonce' not in fetched:
+                    return None
+                self._next_nonce = fetched['nonce']
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            epoch = self._nonce_epoch
+        return nonce, self._fee_cache[1], self._chain_id, epoch
+
+    def _tx_params(self) -> Tuple[int, Tuple[int, int], int, int]:
+        """Return (nonce, (maxFee, tip), chainId, nonce epoch), batching whatever isn't cached into one round trip"""
+        while True:
+            now = time.monotonic()
+            calls = self._pending_calls(self.w3.eth)
+            results = []
+            if calls:
+                try:
+                    with self.w3.batch_requests() as batch:
+                        for call in calls.values():
+                            batch.add(call())
+                        results = batch.execute()
+                except Exception:
+                    # Node doesn't support batching; fall back to sequential calls
+                    results = [call() for call in calls.values()]
+            params = self._reserve_tx_params(dict(zip(calls, results)), now)
+            if params:
+                return params
+
+    async def _tx_params_async(self) -> Tuple[int, Tuple[int, int], int, int]:
+        """Async _tx_params; the uncached lookups run concurrently"""
+        while True:
+            now = time.monotonic()
+            calls = self._pending_calls(self.aw3.eth)
+            results = await asyncio.gather(*[call() for call in calls.values()])
+            params = self._reserve_tx_params(dict(zip(calls, results)), now)
+            if params:
+                return params
+
+    def _router_swap_error(self, token_out: str, min_out: Optional[int]) -> Optional[str]:
+        """Why a router swap can't be built, or None. Checked before a nonce is reserved so a refusal leaves no gap."""
+        if not min_out:
+            return "min_out is required when token_out is a contract address (it is the slippage bound)"
+        if self._chain_id not in UNISWAP_V2:
+            return f"No Uniswap V2 router configured for chain {self._chain_id}"
+        return None
+
+    def _swap_tx(self, nonce: int, fees: Tuple[int, int], chain_id: int, amount: float, token_out: str, min_out: Optional[int]) -> Dict:
+        tx = {
+            'nonce': nonce,
+            'to': self.wallet_address, # Self-transfer for test
+            'value': Web3.to_wei(amount, 'ether'),
+            'gas': 21000,
+            'type': 2,
+            'maxFeePerGas': fees[0],
+            'maxPriorityFeePerGas': fees[1],
+            'chainId': chain_id
+        }
+        if _ADDRESS_RE.match(token_out):
+            # Token contract given: route ETH -> token through the Uniswap V2 router
+            router, weth = UNISWAP_V2[chain_id]
+            tx['to'] = router
+            tx['gas'] = SWAP_GAS_LIMIT
+            tx['data'] = self._router.encode_abi('swapExactETHForTokens', args=[
+                min_out, [weth, _checksum(token_out)],
+                self.wallet_address, int(time.time()) + SWAP_DEADLINE_SECS
+            ])
+        # Otherwise (a bare symbol), simple transfer logic as a placeholder for complex DEX routing:
+        # send `amount` to self to verify on-chain activity
+        return tx
+
+    def _broadcast(self, raw_tx: bytes):
+        """Send to every RPC endpoint in parallel; returns once any node accepts (or already has) the tx"""
+        if not self._broadcast_pool:
+            try:
+                return self.w3.eth.send_raw_transaction(raw_tx)
+            except Exception as e:
+                if _already_known(e):
+                    return None
+                raise
+        futures = [self._broadcast_pool.submit(w.eth.send_raw_transaction, raw_tx) for w in self._providers]
+        error = None
+        for f in as_completed(futures):
+            exc = f.exception()
+            if exc is None or _already_known(exc):
+                for other in futures:
+                    other.cancel()
+                return f.result() if exc is None else None
+            error = error or exc
+        raise error
+
+    async def _broadcast_async(self, raw_tx: bytes):
+        """Async _broadcast"""
+        if len(self._async_providers) == 1:
+            try:
+                return await self.aw3.eth.send_raw_transaction(raw_tx)
+            except Exception as e:
+                if _already_known(e):
+                    return None
+                raise
+        tasks = [asyncio.ensure_future(w.eth.send_raw_transaction(raw_tx)) for w in self._async_providers]
+        error = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    if _already_known(e):
+                        return None
+                    error = error or e
+            raise error
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    def _broadcast_failed(self, e: Exception, attempt: int) -> bool:
+        """Reset cached state after a failed broadcast; True if the swap should be retried"""
+        with self._nonce_lock:
+            self._next_nonce = None # Resync from the node
+            self._nonce_epoch += 1
+        if "replacement transaction underpriced" in str(e):
+            self._fee_cache = (0.0, (0, 0)) # Stale fees; refetch next time
+        return attempt == 0 and any(m in str(e).lower() for m in NONCE_ERRORS)
+
+    def _swap_result(self, tx_hash, amount: float, token_in: str, token_out: str) -> Dict:
+        self._bal_cache.clear() # The swap spends value and gas
+        tx_hex = Web3.to_hex(tx_hash)
+        return {
+            "status": "success",
+            "tx_hash": tx_hex,
+            "message": f"Broadcasting Real TX: {amount} {token_in} -> {token_out}",
+            "explorer_link": f"https://etherscan.io/tx/{tx_hex}"
+        }
+
+    def _fast_get_balance(self, addr: str) -> int:
+        """eth_getBalance via a raw POST on the shared session, decoded by msgspec"""
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_getBalance", "params": [addr, "latest"]}
+        resp = _SESSION.post(self.rpc_url, json=payload, timeout=10)
+        resp.raise_for_status()
+        r = _RPC_DECODER.decode(resp.content)
+        if r.result is None:
+            raise ValueError(r.error or "Empty RPC response")
+        return int(r.result, 16)
 
     def get_balance(self) -> Dict:
         """Get ETH/Native token balance"""
         if not self.w3:
             return {"status": "error", "message": "Wallet not connected"}
         
+        entry = self._bal_cache.get(self.wallet_address)
+        if entry and time.monotonic() - entry[0] < BALANCE_TTL:
+            return entry[1]
+        try:
+            if self._fast_mode:
+                return self._balance_result(self._fast_get_balance(self.wallet_address))
+            return self._balance_result(self.w3.eth.get_balance(self.wallet_address))
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def get_balance_async(self) -> Dict:
+        """get_balance over AsyncWeb3, so it doesn't pin a thread for the RPC.
+        Near-expiry cache hits are served stale while a background task refreshes them."""
+        if not self.aw3:
+            return {"status": "error", "message": "Wallet not connected"}
+        
+        entry = self._bal_cache.get(self.wallet_address)
+        if entry:
+            age = time.monotonic() - entry[0]
+            if age < BALANCE_TTL:
+                if age > BALANCE_REFRESH_AGE and (self._bal_task is None or self._bal_task.done()):
+                    self._bal_task = asyncio.create_task(self._fetch_balance_async())
+                return entry[1]
+        return await self._fetch_balance_async()
+
+    async def _fetch_balance_async(self) -> Dict:
+        try:
+            await self._ensure_async_connected()
+            return self._balance_result(await self.aw3.eth.get_balance(self.wallet_address))
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def get_token_balances(self, tokens: List[str]) -> Dict:
+        """ERC20 balances of this wallet for many tokens in one eth_call (Multicall3 aggregate3)"""
+        if not self.w3:
+            return {"status": "error", "message": "Wallet not connected"}
+        
+        bad = [t for t in tokens if not _ADDRESS_RE.match(t)]
+        if bad:
+            return {"status": "error", "message": f"Invalid token address: {bad[0]}"}
         try:
-            balance_wei = self.w3.eth.get_balance(self.wallet_address)
-            balance_eth = self.w3.from_wei(balance_wei, 'ether')
-            return {
-                "status": "success",
-                "address": self.wallet_address,
-                "balance_wei": balance_wei,
-                "balance_eth": float(balance_eth),
-                "symbol": "ETH" # Or MATIC/BNB depending on chain
+            call_data = self._erc20.encode_abi('balanceOf', args=[self.wallet_address])
+            calls = [(_checksum(t), True, call_data) for t in tokens]
+            results = self._multicall.functions.aggregate3(calls).call()
+            # allowFailure=True: a failing token (e.g. not an ERC20) yields None instead of reverting the batch
+            balances = {
+                t: int.from_bytes(data, 'big') if ok and len(data) == 32 else None
+                for t, (ok, data) in zip(tokens, results)
             }
+            return {"status": "success", "address": self.wallet_address, "balances": balances}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def execute_swap(self, token_in: str, token_out: str, amount: float) -> Dict:
+    def _balance_result(self, balance_wei: int) -> Dict:
+        result = {
+            "status": "success",
+            "address": self.wallet_address,
+            "balance_wei": balance_wei,
+            "balance_eth": balance_wei / WEI_PER_ETH, # Plain float division; no Decimal round trip
+            "symbol": "ETH" # Or MATIC/BNB depending on chain
+        }
+        self._bal_cache[self.wallet_address] = (time.monotonic(), result)
+        return result
+
+    def execute_swap(self, token_in: str, token_out: str, amount: float, min_out: Optional[int] = None) -> Dict:
         """
         Execute a REAL token swap on a DEX.
         WARNING: This consumes real funds and gas.
+        If token_out is a contract address, swaps via Uniswap V2 for at least min_out token units
+        (required in that case, and only on chains listed in UNISWAP_V2).
         """
         if not self.w3:
             return {"status": "error", "message": "Wallet not connected"}
@@ -69,41 +610,106 @@ class WalletManager:
         # 4. Broadcast
         
         try:
-            # Simple transfer logic as a placeholder for complex DEX routing
-            # In production this calls Uniswap V2/V3 Router 'swapExactETHForTokens'
+            if _ADDRESS_RE.match(token_out):
+                if self._chain_id is None:
+                    self._chain_id = self.w3.eth.chain_id
+                error = self._router_swap_error(token_out, min_out)
+                if error:
+                    return {"status": "error", "message": error}
+            for attempt in range(2):
+                nonce, fees, chain_id, _ = self._tx_params()
+                tx = self._swap_tx(nonce, fees, chain_id, amount, token_out, min_out)
+                
+                # SIGN the transaction
+                signed_tx = self.account.sign_transaction(tx)
+                # The hash is keccak of the signed bytes; no need to trust (or wait on) the node's echo
+                tx_hash = keccak(signed_tx.raw_transaction)
+                
+                # BROADCAST
+                try:
+                    self._broadcast(signed_tx.raw_transaction)
+                    break
+                except Exception as e:
+                    if not self._broadcast_failed(e, attempt):
+                        raise
             
-            # Example: Send 0.0 value transaction to self to verify on-chain activity
-            tx = {
-                'nonce': self.w3.eth.get_transaction_count(self.wallet_address),
-                'to': self.wallet_address, # Self-transfer for test
-                'value': self.w3.to_wei(amount, 'ether'),
-                'gas': 21000,
-                'gasPrice': self.w3.eth.gas_price,
-                'chainId': self.w3.eth.chain_id
-            }
+            return self._swap_result(tx_hash, amount, token_in, token_out)
+            
+        except Exception as e:
+             logger.error("On-chain error: %s", e)
+             return {"status": "error", "message": f"On-Chain Error: {str(e)}"}
+
+    async def execute_swap_async(self, token_in: str, token_out: str, amount: float, min_out: Optional[int] = None) -> Dict:
+        """
+        execute_swap for async callers: RPCs run on AsyncWeb3 and
+        signing runs in the process pool, so the event loop is never blocked.
+        Returns as soon as the tx is signed; broadcast happens in the background
+        (see wait_for_receipt).
+        """
+        if not self.aw3:
+            return {"status": "error", "message": "Wallet not connected"}
+        
+        try:
+            await self._ensure_async_connected()
+            if _ADDRESS_RE.match(token_out):
+                if self._chain_id is None:
+                    self._chain_id = await self.aw3.eth.chain_id
+                error = self._router_swap_error(token_out, min_out)
+                if error:
+                    return {"status": "error", "message": error}
+            loop = asyncio.get_running_loop()
+            if self._broadcaster_task is None:
+                self._tx_queue = asyncio.Queue()
+                self._broadcaster_task = asyncio.create_task(self._broadcaster())
             
-            # SIGN the transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
+            nonce, fees, chain_id, epoch = await self._tx_params_async()
+            tx = self._swap_tx(nonce, fees, chain_id, amount, token_out, min_out)
+            raw_tx = await loop.run_in_executor(_get_sign_pool(), _sign_transaction_worker, self.private_key, tx)
             
-            # BROADCAST
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            # The tx hash is keccak of the signed bytes, so it's known before any node sees it
+            tx_hash = keccak(raw_tx)
+            tx_hex = Web3.to_hex(tx_hash)
+            if len(self._receipts) >= MAX_TRACKED_TXS:
+                self._receipts.pop(next(iter(self._receipts)))
+            fut = loop.create_future()
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception()) # Unawaited failures aren't errors
+            self._receipts[tx_hex] = fut
+            self._tx_queue.put_nowait((raw_tx, tx_hex, epoch))
             
-            return {
-                "status": "success",
-                "tx_hash": self.w3.to_hex(tx_hash),
-                "message": f"Broadcasting Real TX: {amount} {token_in} -> {token_out}",
-                "explorer_link": f"https://etherscan.io/tx/{self.w3.to_hex(tx_hash)}"
-            }
+            return self._swap_result(tx_hash, amount, token_in, token_out)
             
         except Exception as e:
+             logger.error("On-chain error: %s", e)
              return {"status": "error", "message": f"On-Chain Error: {str(e)}"}
 
+    def sign_many(self, txs: List[Dict]) -> List[bytes]:
+        """Sign fully-populated tx dicts in parallel; returns raw signed txs in input order"""
+        if not self.account:
+            return []
+        return [bytes(signed.raw_transaction) for signed in self._sign_pool.map(self.account.sign_transaction, txs)]
+
     def sign_message(self, message: str) -> Optional[str]:
         """Sign a message with the private key (for auth)"""
         if not self.w3:
             return None
             
-        from eth_account.messages import encode_defunct
-        encoded_msg = encode_defunct(text=message)
-        signed_msg = self.w3.eth.account.sign_message(encoded_msg, private_key=self.private_key)
-        return signed_msg.signature.hex()
+        return self.account.sign_message(encode_defunct(text=message)).signature.hex()
+
+    async def sign_message_async(self, message: str) -> Optional[str]:
+        """sign_message for async callers; signing runs in the process pool"""
+        if not self.w3:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_sign_pool(), _sign_message_worker, self.private_key, message)
+
+    def verify_messages_batch(self, msgs_sigs: List[Tuple[str, bytes]], address: Optional[str] = None) -> List[bool]:
+        """Check which (message, signature) pairs were signed by address (default: this wallet)"""
+        address = address or self.wallet_address
+        if not address:
+            return [False] * len(msgs_sigs)
+        expected = bytes.fromhex(address[2:] if address.startswith('0x') else address)
+        chunks = [msgs_sigs[i:i + VERIFY_CHUNK] for i in range(0, len(msgs_sigs), VERIFY_CHUNK)]
+        if len(chunks) <= 1:
+            return _verify_chunk(expected, msgs_sigs)
+        futures = [_VERIFY_POOL.submit(_verify_chunk, expected, chunk) for chunk in chunks]
+        return [ok for f in futures for ok in f.result()]